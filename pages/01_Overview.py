@@ -3,19 +3,21 @@ import plotly.graph_objects as go
 from utils.gbfs import merged_station_frame, get_snapshot_history
 from utils.plots import kpi_cards, top_stations_bar, short_term_trend_chart, utilization_hist
 from utils.badges import award_badge
+from utils.stats import station_summary
 
 st.set_page_config(page_title="Overview • RidePulse NYC", page_icon="📊", layout="wide")
 award_badge("explorer")
 
 st.title("📊 Overview")
 df = merged_station_frame()
+summary = station_summary(df)
 
 # KPIs
 c1, c2, c3, c4 = st.columns(4)
 kpi_cards(df, c1, c2, c3, c4)
 
 # Animated gauge for Avg Fill
-avg_fill = float(df["percent_full"].mean() * 100) if len(df) else 0.0
+avg_fill = summary["avg_fill"] * 100
 gcol, _ = st.columns([1,3])
 with gcol:
     gauge = go.Figure(go.Indicator(
@@ -49,8 +51,8 @@ st.markdown("### 🧭 Distribution")
 st.plotly_chart(utilization_hist(df), use_container_width=True)
 
 st.markdown("#### ✨ Story beats (auto-generated)")
-top_full = df.sort_values("percent_full", ascending=False).head(1)
-top_empty = df.sort_values("num_bikes_available", ascending=True).head(1)
+top_full = summary["top"]["fullest"].head(1)
+top_empty = summary["top"]["emptiest"].head(1)
 if not top_full.empty:
     st.write(f"• Nearing capacity: {top_full.iloc[0]['name']} ({top_full.iloc[0]['percent_full']*100:.1f}% full).")
 if not top_empty.empty:
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.gbfs import merged_station_frame
+from utils.gbfs import merged_station_frame, station_cohorts, with_cohorts
 from utils.models import classify_station_traffic
 from utils.badges import award_badge
 
@@ -7,36 +7,51 @@ st.set_page_config(page_title="Stations • RidePulse NYC", page_icon="📍", la
 award_badge("station_sage")
 
 st.title("📍 Stations Explorer")
-df = merged_station_frame().copy()
+df = with_cohorts(merged_station_frame())
 
 # Classification labels
-labels = classify_station_traffic(df)
+labels = classify_station_traffic(df, sample_weight=df.get("quality_weight"))
 df["traffic"] = labels if labels else "Medium"
 
 # Search / filters
-qcol, f1, f2 = st.columns([2,1,1])
+qcol, f1, f3, f2 = st.columns([2,1,1,1])
 query = qcol.text_input("Search by station name", "")
 traffic_filter = f1.multiselect("Traffic Level", options=sorted(df["traffic"].astype(str).unique()), default=sorted(df["traffic"].astype(str).unique()))
+cohort_filter = f3.multiselect("Daily Profile", options=sorted(df["cohort"].unique()), default=sorted(df["cohort"].unique()))
 min_bikes = f2.slider("Min available bikes", 0, int(df["num_bikes_available"].max()), 0)
 
 filtered = df[
     df["traffic"].astype(str).isin(traffic_filter)
+    & df["cohort"].isin(cohort_filter)
     & df["num_bikes_available"].ge(min_bikes)
     & df["name"].str.contains(query, case=False, na=False)
 ]
 
 st.caption(f"Showing {len(filtered)} of {len(df)} stations")
+if "anomaly" in df.columns and df["anomaly"].any():
+    st.caption(f"⚠️ {int(df['anomaly'].sum())} stations look suspect (stale, frozen, or inconsistent counts) — see Data Quality.")
 
 st.dataframe(
-    filtered[["name","num_bikes_available","num_docks_available","percent_full","traffic","capacity"]]
+    filtered[["name","num_bikes_available","num_docks_available","percent_full","traffic","cohort","capacity","anomaly_reason"]]
     .rename(columns={
         "name":"Station",
         "num_bikes_available":"🚲 Bikes",
         "num_docks_available":"🅿️ Docks",
         "percent_full":"% Full",
         "traffic":"Traffic",
-        "capacity":"Capacity"
+        "cohort":"Daily Profile",
+        "capacity":"Capacity",
+        "anomaly_reason":"Data Quality"
     }).assign(**{"% Full": (filtered["percent_full"]*100).round(1)}),
     use_container_width=True,
     height=520
-)
\ No newline at end of file
+)
+
+st.markdown("### 🕒 Daily Profile Cohorts")
+_, centroids = station_cohorts()
+if len(centroids) == 0:
+    st.info("Cohorts need at least half a day of recorded snapshots per station. Keep the app running to build profiles.")
+else:
+    st.caption("Normalized station fill over the local day for each cohort (refit once a day).")
+    st.line_chart(centroids)
+    st.dataframe(df["cohort"].value_counts().rename("Stations"), use_container_width=True)
@@ -1,14 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils.gbfs import get_snapshot_history
+from utils.gbfs import get_snapshot_history, get_history_range
 from utils.badges import award_badge
 
 st.set_page_config(page_title="Trends • RidePulse NYC", page_icon="📈", layout="wide")
 award_badge("trend_hunter")
 
 st.title("📈 Trends from Recent Snapshots")
-hist = get_snapshot_history()
+WINDOWS = {"Last 3 hours": None, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+window = st.radio("Window", list(WINDOWS), horizontal=True)
+if WINDOWS[window] is None:
+    hist = get_snapshot_history()
+else:
+    hist = get_history_range(pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=WINDOWS[window]))
+    st.caption("Snapshots older than 7 days are archived at 15-minute resolution.")
 
 if isinstance(hist, list) or len(hist) < 5:
     st.info("Collecting snapshot history. Come back in a few minutes to see richer trends.")
@@ -18,10 +24,10 @@ else:
 
     c1, c2 = st.columns(2)
     with c1:
-        fig1 = px.line(df, x="ts_local", y=["total_bikes","total_docks"], title="Bikes and Docks Over Time", markers=True)
+        fig1 = px.line(df, x="ts_local", y=["total_bikes","total_docks"], title="Bikes and Docks Over Time", markers=len(df) <= 500)
         st.plotly_chart(fig1, use_container_width=True)
     with c2:
-        fig2 = px.line(df, x="ts_local", y="avg_percent_full", title="Average Station Fill (%)", markers=True)
+        fig2 = px.line(df, x="ts_local", y="avg_percent_full", title="Average Station Fill (%)", markers=len(df) <= 500)
         fig2.update_traces(line_color="#f59e0b")
         st.plotly_chart(fig2, use_container_width=True)
 
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-from utils.gbfs import merged_station_frame, get_snapshot_history
+from utils.gbfs import merged_station_frame, get_snapshot_history, get_station_history
+from utils.backtest import backtest, leaderboard, best_by_series
 from utils.models import moving_average_forecast, estimate_trip_duration_minutes, rider_type_predictor, classify_station_traffic
 from utils.badges import award_badge
 
@@ -13,12 +14,13 @@ st.title("🧠 Models Lab — Interactive")
 df = merged_station_frame()
 hist = get_snapshot_history()
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "Short-term Ride Prediction",
     "Busiest Station Classifier",
     "Trip Duration Estimator",
     "Rider Type Predictor",
-    "Weekend vs Weekday Explorer"
+    "Weekend vs Weekday Explorer",
+    "Forecast Backtest"
 ])
 
 with tab1:
@@ -37,7 +39,7 @@ with tab1:
 
 with tab2:
     st.subheader("Traffic Levels (Live)")
-    labels = classify_station_traffic(df)
+    labels = classify_station_traffic(df, sample_weight=df.get("quality_weight"))
     if labels:
         df2 = df.copy()
         df2["traffic"] = labels
@@ -78,4 +80,38 @@ with tab5:
         temp = hist.copy()
         temp["dow"] = pd.to_datetime(temp["ts"]).dt.tz_convert(None).dt.day_name()
         chart = temp.groupby("dow")["total_bikes"].mean().reset_index()
-        st.bar_chart(chart.set_index("dow"))
\ No newline at end of file
+        st.bar_chart(chart.set_index("dow"))
+
+@st.cache_data(ttl=300)
+def _backtest_network(n: int):
+    full = get_snapshot_history(n)
+    if isinstance(full, list) or len(full) < 40:
+        return None
+    series = full.set_index("ts")[["total_bikes", "total_docks"]]
+    return backtest(series, horizons=(1, 5, 10), min_train=30, workers=1)
+
+@st.cache_data(ttl=300)
+def _backtest_stations(n: int):
+    per_station = get_station_history(n)
+    if len(per_station) < 40:
+        return None
+    return backtest(per_station, horizons=(1, 5, 10), min_train=30)
+
+with tab6:
+    st.subheader("Rolling-origin Backtest")
+    st.caption("Every stored snapshot after a 30-snapshot warm-up is a forecast origin; errors are averaged per horizon, counted in snapshots. Snapshots are about a minute apart while the app is in use, with gaps while it is idle.")
+    net = _backtest_network(100_000)
+    if net is None:
+        st.info("Need at least 40 snapshots to backtest. Try again later.")
+    else:
+        st.markdown("#### Network totals")
+        st.dataframe(leaderboard(net).round(2), use_container_width=True)
+        if st.button("Run per-station backtest (all cores)"):
+            res = _backtest_stations(360)
+            if res is None:
+                st.info("Need at least 40 per-station snapshots in the recent-state ring.")
+            else:
+                st.markdown("#### Stations")
+                st.dataframe(leaderboard(res).round(2), use_container_width=True)
+                wins = best_by_series(res, 10)["forecaster"].value_counts()
+                st.bar_chart(wins.rename("stations where best (10-snapshot horizon)"))
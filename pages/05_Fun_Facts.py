@@ -3,19 +3,25 @@ import plotly.express as px
 from utils.gbfs import merged_station_frame
 from utils.plots import top_stations_bar, utilization_hist
 from utils.badges import award_badge
+from utils.stats import station_summary
 
 st.set_page_config(page_title="Fun Facts • RidePulse NYC", page_icon="🎉", layout="wide")
 award_badge("fact_finder")
 
 st.title("🎉 Fun Facts — Live and Auto-Generated")
 df = merged_station_frame()
+summary = station_summary(df)
+top = summary["top"]
+
+def _first_name(ranking):
+    return ranking["name"].iloc[0] if len(ranking) > 0 else "-"
 
 # Top facts
 cols = st.columns(3)
 facts = [
-    ("🏙️ Most Bikes Now", df.loc[df["num_bikes_available"].idxmax(), "name"] if len(df)>0 else "-"),
-    ("🥇 Highest Fill %", df.loc[df["percent_full"].idxmax(), "name"] if len(df)>0 else "-"),
-    ("🆓 Most Docks Free", df.loc[df["num_docks_available"].idxmax(), "name"] if len(df)>0 else "-"),
+    ("🏙️ Most Bikes Now", _first_name(top["most_bikes"])),
+    ("🥇 Highest Fill %", _first_name(top["fullest"])),
+    ("🆓 Most Docks Free", _first_name(top["most_docks"])),
 ]
 for i, (label, val) in enumerate(facts):
     with cols[i]:
@@ -23,18 +29,21 @@ for i, (label, val) in enumerate(facts):
 
 # Fact cards
 st.markdown("### ✨ Live Fact Cards")
-if len(df) > 0:
+if summary["trusted"] > 0:
     facts_list = []
     facts_list.append(f"Total stations online: {len(df)}")
-    facts_list.append(f"Citywide average fill: {(df['percent_full'].mean()*100):.1f}%")
-    facts_list.append(f"Stations with zero bikes: {(df['num_bikes_available']==0).sum()}")
-    facts_list.append(f"Stations with zero docks: {(df['num_docks_available']==0).sum()}")
-    facts_list.append(f"Top 3 by bikes: {', '.join(df.sort_values('num_bikes_available',ascending=False).head(3)['name'].tolist())}")
-    facts_list.append(f"Top 3 by docks: {', '.join(df.sort_values('num_docks_available',ascending=False).head(3)['name'].tolist())}")
-    facts_list.append(f"Median available bikes: {int(df['num_bikes_available'].median())}")
-    facts_list.append(f"Median open docks: {int(df['num_docks_available'].median())}")
-    facts_list.append(f"Max capacity observed: {int((df['num_bikes_available']+df['num_docks_available']).max())}")
-    facts_list.append(f"Avg bikes per station: {df['num_bikes_available'].mean():.1f}")
+    quantiles = summary["quantiles"]
+    facts_list.append(f"Citywide average fill: {summary['avg_fill']*100:.1f}%")
+    facts_list.append(f"Stations with zero bikes: {summary['zero_bikes']}")
+    facts_list.append(f"Stations with zero docks: {summary['zero_docks']}")
+    facts_list.append(f"Stations flagged as suspect: {summary['suspect']}")
+    facts_list.append(f"Top 3 by bikes: {', '.join(top['most_bikes'].head(3)['name'].tolist())}")
+    facts_list.append(f"Top 3 by docks: {', '.join(top['most_docks'].head(3)['name'].tolist())}")
+    facts_list.append(f"Median available bikes: {int(quantiles.loc[0.5, 'bikes'])}")
+    facts_list.append(f"Median open docks: {int(quantiles.loc[0.5, 'docks'])}")
+    facts_list.append(f"Max capacity observed: {summary['max_capacity']}")
+    facts_list.append(f"Avg bikes per station: {summary['avg_bikes']:.1f}")
+    facts_list.append(f"Availability index (bikes and docks both free): {summary['availability_index']*100:.1f}%")
 
     rows = (len(facts_list) + 2)//3
     k = 0
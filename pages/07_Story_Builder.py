@@ -4,6 +4,7 @@ import plotly.express as px
 from utils.gbfs import merged_station_frame, get_snapshot_history
 from utils.plots import top_stations_bar
 from utils.badges import award_badge
+from utils.stats import station_summary
 
 st.set_page_config(page_title="Story Builder • RidePulse NYC", page_icon="📖", layout="wide")
 award_badge("storyteller")
@@ -14,7 +15,7 @@ df = merged_station_frame()
 hist = get_snapshot_history()
 
 st.markdown("### Story 1: The Race to Rebalance")
-top_full = df.sort_values("percent_full", ascending=False).head(5)
+top_full = station_summary(df)["top"]["fullest"].head(5)
 st.write("Stations nearing capacity often need quick rebalancing. Here are the top 5 at risk right now.")
 st.dataframe(top_full[["name","percent_full","num_bikes_available","num_docks_available"]]
              .assign(**{"percent_full": (top_full["percent_full"]*100).round(1)}),
@@ -1,6 +1,7 @@
 import streamlit as st
 import pydeck as pdk
-from utils.gbfs import merged_station_frame
+from utils.gbfs import merged_station_frame, travel_matrix, with_cohorts
+from utils.cohorts import NOT_ENOUGH_HISTORY
 from utils.badges import award_badge
 
 st.set_page_config(page_title="Live Map • RidePulse NYC", page_icon="🗺️", layout="wide")
@@ -8,13 +9,35 @@ award_badge("cartographer")
 
 st.title("🗺️ Live Map")
 
-df = merged_station_frame().copy()
+df = with_cohorts(merged_station_frame())
 if len(df) == 0:
     st.info("No station data available.")
     st.stop()
 
 df_map = df.rename(columns={"lat":"latitude","lng":"longitude"})
 
+COHORT_COLORS = [[37, 99, 235, 170], [245, 158, 11, 170], [16, 185, 129, 170], [236, 72, 153, 170], [139, 92, 246, 170]]
+color_by = st.radio("Color stations by", ["Fill level", "Daily profile cohort"], horizontal=True)
+cohort_names = sorted(n for n in df_map["cohort"].unique() if n != NOT_ENOUGH_HISTORY)
+palette = {n: COHORT_COLORS[i % len(COHORT_COLORS)] for i, n in enumerate(cohort_names)}
+df_map["cohort_color"] = df_map["cohort"].map(palette).apply(lambda c: c if isinstance(c, list) else [148, 163, 184, 120])
+
+# Isochrone: stations reachable from a chosen start within N minutes
+icol, mcol = st.columns([3, 1])
+origin_name = icol.selectbox("Reachable from (optional)", ["—"] + df["name"].sort_values().tolist())
+iso_minutes = mcol.slider("Within minutes", 5, 30, 15)
+reach = df_map.iloc[0:0]
+if origin_name != "—":
+    origin_id = df.loc[df["name"] == origin_name, "station_id"].iloc[0]
+    try:
+        within = travel_matrix().within(origin_id, iso_minutes)
+    except KeyError:
+        within = None
+    if within is not None:
+        reach = df_map[df_map["station_id"].astype(str).isin(within.index)].copy()
+        reach["minutes"] = reach["station_id"].astype(str).map(within)
+        st.caption(f"{len(reach) - 1} stations within {iso_minutes} min of {origin_name} (est.)")
+
 INITIAL_VIEW_STATE = pdk.ViewState(
     latitude=40.7580, longitude=-73.9855, zoom=11, pitch=35
 )
@@ -24,7 +47,7 @@ scatter = pdk.Layer(
     data=df_map,
     get_position=["longitude", "latitude"],
     get_radius="(num_bikes_available+1)*3",
-    get_fill_color="[percent_full*255, 120, 200, 160]",
+    get_fill_color="cohort_color" if color_by == "Daily profile cohort" else "[percent_full*255, 120, 200, 160]",
     pickable=True,
     auto_highlight=True
 )
@@ -66,16 +89,25 @@ arc_layer = pdk.Layer(
     pickable=True
 )
 
+iso_layer = pdk.Layer(
+    "ScatterplotLayer",
+    data=reach,
+    get_position=["longitude", "latitude"],
+    get_radius=60,
+    get_fill_color=[34, 197, 94, 200],
+    pickable=True
+)
+
 r = pdk.Deck(
-    layers=[hex_layer, scatter, arc_layer],
+    layers=[hex_layer, scatter, arc_layer, iso_layer],
     initial_view_state=INITIAL_VIEW_STATE,
-    tooltip={"text": "{name}\n🚲 {num_bikes_available}  🅿️ {num_docks_available}"}
+    tooltip={"text": "{name}\n🚲 {num_bikes_available}  🅿️ {num_docks_available}\n{cohort}"}
 )
 
 st.pydeck_chart(r, use_container_width=True, height=660)
 
 st.markdown("""
 <div class="rp-fact" style="margin-top:10px;">
-<b>Legend:</b> Color = fill level, Radius/Elevation = available bikes. Arcs suggest rebalancing (near-full → near-empty).
+<b>Legend:</b> Color = fill level (or daily profile cohort), Radius/Elevation = available bikes. Arcs suggest rebalancing (near-full → near-empty).
 </div>
 """, unsafe_allow_html=True)
\ No newline at end of file
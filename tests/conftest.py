@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Pages import `utils` from the repo root; make that work for a bare `pytest` too.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
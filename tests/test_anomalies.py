@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from utils.anomalies import FROZEN_NO_BASELINE_MIN, StationAnomalyDetector, trusted
+
+T0 = pd.Timestamp("2026-10-19 08:00", tz="UTC")
+
+
+def _frame(bikes, now, **cols):
+    n = len(bikes)
+    bikes = np.asarray(bikes)
+    return pd.DataFrame({
+        "station_id": [f"s{i}" for i in range(n)],
+        "num_bikes_available": bikes,
+        "num_docks_available": 20 - bikes,
+        "capacity": 20,
+        "is_installed": 1,
+        "is_renting": 1,
+        "last_reported": now.timestamp(),
+        **cols,
+    })
+
+
+def _poll(det, bikes, now, **cols):
+    return det.update(_frame(bikes, now, **cols), version=now, now=now)
+
+
+def test_idle_gap_is_not_silence():
+    det = StationAnomalyDetector()
+    bikes = np.r_[np.zeros(150, int), np.full(50, 5)]
+    for m in range(30):
+        _poll(det, bikes + (m % 2) * (bikes > 0), T0 + pd.Timedelta(minutes=m))
+    flags = _poll(det, bikes + 3 * (bikes > 0), T0 + pd.Timedelta(hours=5))
+    assert not flags["frozen_counts"].any()
+
+
+def test_stuck_station_is_flagged_under_regular_polling():
+    det = StationAnomalyDetector()
+    for m in range(FROZEN_NO_BASELINE_MIN + 1):
+        flags = _poll(det, [m % 3, 4], T0 + pd.Timedelta(minutes=m))
+    assert flags["frozen_counts"].tolist() == [False, True]
+    assert flags["quality_weight"].tolist() == [1.0, 0.0]
+
+
+def test_silence_before_an_idle_gap_still_counts():
+    det = StationAnomalyDetector()
+    for m in range(200):
+        _poll(det, [m % 3, 4], T0 + pd.Timedelta(minutes=m))
+    later = T0 + pd.Timedelta(minutes=199) + pd.Timedelta(hours=6)
+    for m in range(60):
+        flags = _poll(det, [m % 3, 4], later + pd.Timedelta(minutes=m))
+    assert flags["frozen_counts"].tolist() == [False, True]
+
+
+def test_instant_checks():
+    det = StationAnomalyDetector()
+    df = _frame([3, 3, 3], T0)
+    df.loc[0, "last_reported"] = (T0 - pd.Timedelta(hours=1)).timestamp()
+    df.loc[1, "is_renting"] = 0
+    df.loc[2, "capacity"] = 40
+    flags = det.update(df, now=T0)
+    assert flags["anomaly_reason"].tolist() == ["stale_report", "not_renting_with_bikes", "capacity_mismatch"]
+    assert flags["quality_weight"].tolist() == [0.0, 0.5, 0.5]
+    assert len(trusted(df.join(flags))) == 0
+
+
+def test_same_version_reuses_flags_by_station():
+    det = StationAnomalyDetector()
+    df = _frame([3, 3], T0)
+    df.loc[1, "is_renting"] = 0
+    det.update(df, version=1, now=T0)
+    again = det.update(df.iloc[::-1].reset_index(drop=True), version=1, now=T0)
+    assert again["not_renting_with_bikes"].tolist() == [True, False]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.backtest import _ma_levels, _hw_levels, backtest
+from utils.models import moving_average_forecast, holt_winters_like
+
+
+@pytest.fixture
+def gappy_series():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 20, (4, 40)).astype(float)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[0, :3] = np.nan  # leading gap: early origins have nothing to forecast from
+    return X
+
+
+@pytest.mark.parametrize("window", [1, 5])
+def test_ma_levels_match_moving_average_forecast(gappy_series, window):
+    L = _ma_levels(gappy_series, window)
+    for r, row in enumerate(gappy_series):
+        for o in range(len(row) + 1):
+            expected = moving_average_forecast(pd.Series(row[:o]), window=window, horizon=1)[0]
+            np.testing.assert_allclose(L[r, o], expected, equal_nan=True)
+
+
+def test_hw_levels_match_holt_winters_like(gappy_series):
+    L = _hw_levels(gappy_series, alpha=0.3)
+    for r, row in enumerate(gappy_series):
+        for o in range(len(row) + 1):
+            smoothed = holt_winters_like(pd.Series(row[:o]), alpha=0.3)
+            expected = smoothed.iloc[-1] if len(smoothed) else np.nan
+            np.testing.assert_allclose(L[r, o], expected, equal_nan=True)
+
+
+def test_pool_matches_in_process(gappy_series):
+    history = pd.DataFrame(gappy_series.T, columns=list("abcd"))
+    serial = backtest(history, horizons=(1, 3), min_train=5, workers=1)
+    pooled = backtest(history, horizons=(1, 3), min_train=5, workers=2, chunk_rows=2)
+    pd.testing.assert_frame_equal(serial, pooled)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.gbfs as gbfs
+from utils.cohorts import (CLUSTER_BIN_MIN, DAILY_DECAY, NOT_ENOUGH_HISTORY, PROFILE_TZ,
+                           ProfileStore, cluster_profiles)
+from utils.ringbuffer import StationRing
+
+DAY = pd.Timestamp("2026-10-19", tz=PROFILE_TZ)
+
+
+def _write(ring, ts, full):
+    ring.write(ts.tz_convert("UTC"), pd.DataFrame({
+        "station_id": [f"s{i}" for i in range(len(full))], "percent_full": full}))
+
+
+def test_fold_adds_each_slot_to_its_local_minute(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=8, stations=4)
+    store = ProfileStore(tmp_path / "p", stations=ring.stations)
+    _write(ring, DAY + pd.Timedelta("08:30:00"), [0.5, np.nan])
+    _write(ring, DAY + pd.Timedelta("08:31:00"), [0.25, 1.0])
+    assert store.fold(ring) == 2
+    assert store.fold(ring) == 0
+    assert store.sums[0, 510] == 0.5 and store.sums[0, 511] == 0.25
+    assert store.counts[1].tolist().count(1) == 1 and store.counts[1, 511] == 1
+
+
+def test_fold_decays_older_days(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=8, stations=4)
+    store = ProfileStore(tmp_path / "p", stations=ring.stations)
+    _write(ring, DAY + pd.Timedelta("23:59:00"), [0.5])
+    store.fold(ring)
+    _write(ring, DAY + pd.Timedelta(days=2, hours=1), [1.0])
+    store.fold(ring)
+    assert store.counts[0, 1439] == pytest.approx(DAILY_DECAY ** 2)
+    assert store.sums[0, 1439] == pytest.approx(0.5 * DAILY_DECAY ** 2)
+    assert store.counts[0, 60] == 1
+
+
+def _profile(night, day, rng):
+    hours = np.arange(0, 24, CLUSTER_BIN_MIN / 60)
+    base = np.where((hours >= 8) & (hours < 18), day, night)
+    return base + rng.normal(0, 0.02, len(hours))
+
+
+def test_cluster_profiles_names_and_coverage():
+    rng = np.random.default_rng(0)
+    P = np.array([_profile(0.9, 0.1, rng) for _ in range(3)]
+                 + [_profile(0.1, 0.9, rng) for _ in range(3)]
+                 + [np.full(96, np.nan)])
+    P[6, :10] = 0.5
+    cohorts, centroids = cluster_profiles([f"s{i}" for i in range(7)], P, k=2)
+    assert cohorts["cohort"].iloc[:3].nunique() == 1
+    assert cohorts["cohort"].iloc[0].startswith("Residential")
+    assert cohorts["cohort"].iloc[3].startswith("Office")
+    assert cohorts["cohort"].iloc[6] == NOT_ENOUGH_HISTORY
+    assert cohorts["coverage"].iloc[6] == pytest.approx(10 / 96)
+    assert sorted(centroids.columns) == sorted(cohorts["cohort"].iloc[[0, 3]])
+
+
+def test_too_little_history_is_refit_on_the_next_call(tmp_path, monkeypatch):
+    ring = StationRing(tmp_path / "r", slots=100, stations=8)
+    monkeypatch.setattr(gbfs, "COHORTS", tmp_path / "cohorts.parquet")
+    monkeypatch.setattr(gbfs, "COHORT_CENTROIDS", tmp_path / "centroids.parquet")
+    monkeypatch.setattr(gbfs, "PROFILES", tmp_path / "p")
+    monkeypatch.setattr(gbfs, "_ring_reader", lambda: ring)
+    gbfs._cohorts_for_day.clear()
+    assert gbfs.with_cohorts(pd.DataFrame({"station_id": ["s0"]}))["cohort"].iloc[0] == NOT_ENOUGH_HISTORY
+    assert not (tmp_path / "cohorts.parquet").exists()
+
+    rng = np.random.default_rng(1)
+    P = np.array([_profile(0.9, 0.1, rng) for _ in range(3)] + [_profile(0.1, 0.9, rng) for _ in range(3)])
+    store = ProfileStore(tmp_path / "p", stations=ring.stations)
+    for b in range(96):
+        _write(ring, DAY + pd.Timedelta(minutes=CLUSTER_BIN_MIN * b), P[:, b])
+    store.fold(ring)
+    cohorts, centroids = gbfs.station_cohorts()
+    assert len(centroids.columns) > 0
+    assert (cohorts["cohort"] != NOT_ENOUGH_HISTORY).all()
+    assert (tmp_path / "cohorts.parquet").exists()
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from utils.models import TravelMatrix, estimate_trip_duration_minutes
+
+
+def _stations(n=200, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "station_id": [f"s{i}" for i in range(n)],
+        "lat": 40.65 + 0.15 * rng.random(n),
+        "lng": -74.05 + 0.15 * rng.random(n),
+    })
+
+
+def test_travel_matrix_matches_scalar_estimate_cached_or_not():
+    stations = _stations()
+    rng = np.random.default_rng(2)
+    o, d = rng.integers(0, len(stations), 3000), rng.integers(0, len(stations), 3000)
+    expected = np.array([
+        estimate_trip_duration_minutes(stations.iloc[a].to_dict(), stations.iloc[b].to_dict(), 13.0)
+        for a, b in zip(o, d)
+    ])
+    tm = TravelMatrix(stations)
+    ids = stations["station_id"]
+    np.testing.assert_array_equal(tm.pair_durations(ids[o], ids[d], mean_speed_kmh=13.0), expected)
+    tm.durations()  # builds and keeps the full matrix
+    np.testing.assert_array_equal(tm.pair_durations(ids[o], ids[d], mean_speed_kmh=13.0), expected)
+
+
+def test_within_is_the_origin_row_under_the_limit():
+    tm = TravelMatrix(_stations())
+    row = tm.durations(["s7"]).iloc[0]
+    reach = tm.within("s7", 10)
+    assert reach.index[0] == "s7"
+    pd.testing.assert_series_equal(reach, row[row <= 10].sort_values(), check_names=False)
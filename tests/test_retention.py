@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import utils.gbfs as gbfs
+from utils.retention import seal_and_export
+
+NOW = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+
+
+def _history(days=20):
+    ts = pd.date_range(pd.Timestamp(NOW) - pd.Timedelta(days=days), NOW, freq="5min")
+    return pd.DataFrame({"ts": [t.isoformat() for t in ts], "total_bikes": 1, "total_docks": 5,
+                         "active_stations": 100, "avg_percent_full": 0.4})
+
+
+def test_failed_day_stays_live(tmp_path, monkeypatch):
+    real = pd.DataFrame.to_parquet
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise OSError("disk full")
+        return real(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", flaky)
+    live = seal_and_export(_history(), tmp_path, now=NOW)
+    assert len(list(tmp_path.glob("*.parquet"))) == 2
+    assert pd.to_datetime(live["ts"], utc=True).min() == pd.Timestamp("2026-10-01", tz="UTC")
+
+
+@pytest.fixture
+def split_history(tmp_path, monkeypatch):
+    live = seal_and_export(_history(), tmp_path, now=NOW)
+    monkeypatch.setattr(gbfs, "ARCHIVE_DIR", tmp_path)
+    monkeypatch.setattr(gbfs, "_load_snapshots_df", lambda: live.copy())
+
+
+def test_history_range_respects_end_inside_archives(split_history):
+    end = pd.Timestamp(NOW) - pd.Timedelta(days=9)
+    out = gbfs.get_history_range(pd.Timestamp(NOW) - pd.Timedelta(days=10), end)
+    assert len(out) and out["ts"].max() <= end
+
+
+def test_history_range_accepts_naive_start(split_history):
+    out = gbfs.get_history_range(datetime(2026, 10, 9, 12))
+    assert out["ts"].min() >= pd.Timestamp("2026-10-09 12:00", tz="UTC")
+    assert out["ts"].max() == pd.Timestamp(NOW)
+
+
+def test_failed_write_leaves_no_partial_archive(tmp_path, monkeypatch):
+    real = pd.DataFrame.to_parquet
+
+    def truncating(self, path, *args, **kwargs):
+        Path(path).write_bytes(b"PAR1 trunc")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", truncating)
+    hist = _history()
+    live = seal_and_export(hist, tmp_path, now=NOW)
+    assert len(live) == len(hist)
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", real)
+    seal_and_export(hist, tmp_path, now=NOW)
+    assert len(list(tmp_path.glob("*.parquet"))) == 13
+
+
+def test_unreadable_archive_is_moved_aside(tmp_path):
+    bad = tmp_path / "snapshots-2026-10-01.parquet"
+    bad.write_bytes(b"not a parquet file")
+    live = seal_and_export(_history(), tmp_path, now=NOW)
+    assert (tmp_path / "snapshots-2026-10-01.parquet.corrupt").exists()
+    assert len(pd.read_parquet(bad)) == 96
+    assert pd.to_datetime(live["ts"], utc=True).min() == pd.Timestamp("2026-10-12", tz="UTC")
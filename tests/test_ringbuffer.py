@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ringbuffer import RingBusy, StationRing
+
+T0 = pd.Timestamp("2026-10-19 08:00", tz="UTC")
+
+
+def _frame(n, bikes, installed=None):
+    df = pd.DataFrame({
+        "station_id": [f"s{i}" for i in range(n)],
+        "num_bikes_available": bikes,
+        "num_docks_available": 10 - np.asarray(bikes),
+        "is_installed": 1 if installed is None else installed,
+        "last_reported": T0.timestamp(),
+    })
+    df["percent_full"] = df["num_bikes_available"] / 10
+    return df
+
+
+def _parquet_row(df):
+    # the columns record_snapshot_if_due writes to the snapshot history
+    return {
+        "total_bikes": int(df["num_bikes_available"].sum()),
+        "total_docks": int(df["num_docks_available"].sum()),
+        "active_stations": int((df["is_installed"] == 1).sum()),
+        "avg_percent_full": float(df["percent_full"].mean()),
+    }
+
+
+def test_window_is_chronological_after_wrap(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=4, stations=8)
+    for t in range(7):
+        ring.write(T0 + pd.Timedelta(minutes=t), _frame(3, [t, t, t]))
+    assert len(ring) == 4
+    ts, data = ring.window(10, ["num_bikes_available"])
+    assert list(ts) == [T0 + pd.Timedelta(minutes=t) for t in range(3, 7)]
+    assert data[:, 0, 0].tolist() == [3, 4, 5, 6]
+
+
+def test_totals_match_snapshot_history(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=4, stations=8)
+    frames = [_frame(5, [1, 2, 3, 4, 5], installed=[1, 1, 0, 1, 1]), _frame(3, [9, 0, 2])]
+    for t, df in enumerate(frames):
+        ring.write(T0 + pd.Timedelta(minutes=t), df)
+    totals = ring.totals(2)
+    for got, df in zip(totals.to_dict(orient="records"), frames):
+        want = _parquet_row(df)
+        assert {k: got[k] for k in want} == pytest.approx(want)
+
+
+def test_full_ring_records_dropped_stations(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=4, stations=5)
+    ring.write(T0, _frame(10, np.arange(10)))
+    assert ring.dropped == 5
+    assert len(ring.station_ids()) == 5
+    assert StationRing(tmp_path / "r", readonly=True).dropped == 5
+
+
+def test_busy_ring_raises(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=4, stations=8)
+    ring.write(T0, _frame(2, [1, 2]))
+    ring.header[0]["seq"] += 1  # a write that never finishes
+    with pytest.raises(RingBusy):
+        StationRing(tmp_path / "r", readonly=True).window(1)
+
+
+def test_single_writer(tmp_path):
+    ring = StationRing(tmp_path / "r", slots=4, stations=8)
+    with pytest.raises(OSError):
+        StationRing(tmp_path / "r")
+    ring.close()
+    StationRing(tmp_path / "r").close()
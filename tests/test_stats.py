@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from utils.stats import station_summary, summarize_stations
+
+
+def _frame(n=50):
+    return pd.DataFrame({
+        "station_id": [str(i) for i in range(n)],
+        "name": [f"S{i}" for i in range(n)],
+        "num_bikes_available": np.arange(n),
+        "num_docks_available": n - np.arange(n),
+        "percent_full": np.arange(n) / n,
+        "capacity": n,
+        "last_updated_utc": pd.Timestamp("2026-01-01", tz="UTC"),
+    })
+
+
+def test_same_length_subset_gets_its_own_summary():
+    df = _frame(50)
+    full = station_summary(df)
+    other = _frame(60).iloc[10:]  # same status version and length, different stations
+    sub = station_summary(other)
+    assert full["top"]["most_bikes"]["name"].iloc[0] == "S49"
+    assert sub["top"]["most_bikes"]["name"].iloc[0] == "S59"
+    assert sub["total_bikes"] == summarize_stations(other)["total_bikes"]
@@ -0,0 +1,187 @@
+"""
+Headless load test for the RidePulse dashboard.
+
+Serves a fake GBFS feed locally, then ramps up concurrent sessions that each
+rerun every page (app.py + pages/*) with streamlit.testing.AppTest. All
+sessions share one process, so Streamlit caches are shared the same way they
+are on a real host. For every ramp level it reports per-page rerun latency,
+process CPU, RSS growth and how many GBFS fetches the caches let through.
+
+Sessions are threads and share the GIL, just like sessions on one Streamlit
+server, so cpu_pct saturates near 100% (one core) however many cores the host
+has. That ceiling is the single-process limit, not the machine's.
+
+    python tools/loadtest.py --sessions 1 2 4 8 --rounds 3 --stations 2000
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = [ROOT / "app.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+
+class FakeGBFS:
+    """Local GBFS endpoint with `n` stations around Manhattan whose counts drift on each status fetch."""
+
+    def __init__(self, n: int = 2000, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.rng = rng
+        self.capacity = rng.integers(15, 60, n)
+        self.bikes = (self.capacity * rng.random(n)).astype(int)
+        self.info = {"data": {"stations": [
+            {"station_id": f"fake-{i}", "name": f"Fake St & {i} Ave", "capacity": int(c),
+             "lat": float(40.70 + 0.10 * rng.random()), "lon": float(-74.02 + 0.08 * rng.random())}
+            for i, c in enumerate(self.capacity)
+        ]}}
+        self.hits = {"station_information": 0, "station_status": 0}
+        self._lock = threading.Lock()
+
+    def status(self):
+        with self._lock:
+            step = self.rng.integers(-1, 2, len(self.bikes))
+            self.bikes = np.clip(self.bikes + step, 0, self.capacity)
+            now = int(time.time())
+            stations = [
+                {"station_id": f"fake-{i}", "num_bikes_available": int(b), "num_docks_available": int(c - b),
+                 "is_installed": 1, "is_renting": 1, "is_returning": 1, "last_reported": now}
+                for i, (b, c) in enumerate(zip(self.bikes, self.capacity))
+            ]
+        return {"last_updated": now, "data": {"stations": stations}}
+
+    def serve(self):
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.rsplit("/", 1)[-1].replace(".json", "")
+                if name not in feed.hits:
+                    self.send_error(404)
+                    return
+                with feed._lock:
+                    feed.hits[name] += 1
+                body = json.dumps(feed.info if name == "station_information" else feed.status()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # peak, not current, where /proc is unavailable (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def run_session(rounds: int, timeout: float):
+    """One simulated viewer: visit every page `rounds` times. Returns (page, seconds, ok) samples."""
+    from streamlit.testing.v1 import AppTest
+    samples = []
+    for _ in range(rounds):
+        for script in SCRIPTS:
+            at = AppTest.from_file(str(script), default_timeout=timeout)
+            t0 = time.perf_counter()
+            try:
+                at.run()
+                ok = not at.exception
+            except Exception:
+                ok = False
+            samples.append((script.name, time.perf_counter() - t0, ok))
+    return samples
+
+
+def ramp(feed: FakeGBFS, levels, rounds: int, timeout: float):
+    rows, pages = [], []
+    base_rss = rss_mb()
+    for n in levels:
+        hits0 = dict(feed.hits)
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            results = list(pool.map(lambda _: run_session(rounds, timeout), range(n)))
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        samples = pd.DataFrame([s for r in results for s in r], columns=["page", "seconds", "ok"])
+        fetches = sum(feed.hits[k] - hits0[k] for k in feed.hits)
+        rows.append({
+            "sessions": n,
+            "reruns": len(samples),
+            "failed": int((~samples["ok"]).sum()),
+            "p50_s": samples["seconds"].median(),
+            "p95_s": samples["seconds"].quantile(0.95),
+            "reruns_per_s": len(samples) / wall,
+            "cpu_pct": 100.0 * cpu / wall,
+            "rss_mb": rss_mb(),
+            "rss_growth_mb": rss_mb() - base_rss,
+            "gbfs_fetches": fetches,
+            "fetches_per_rerun": fetches / max(len(samples), 1),
+        })
+        by_page = samples.groupby("page")["seconds"].describe(percentiles=[0.5, 0.95])
+        pages.append(by_page[["count", "50%", "95%", "max"]].assign(sessions=n).reset_index())
+    return pd.DataFrame(rows), pd.concat(pages, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent sessions per ramp level")
+    parser.add_argument("--rounds", type=int, default=2, help="passes over all pages per session")
+    parser.add_argument("--stations", type=int, default=2000, help="stations in the fake feed")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun timeout (s)")
+    parser.add_argument("--out", type=Path, help="write summary and per-page tables as JSON here")
+    args = parser.parse_args(argv)
+    if args.out:
+        args.out = args.out.resolve()
+
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    feed = FakeGBFS(args.stations)
+    server = feed.serve()
+    os.environ["RIDEPULSE_GBFS_BASE"] = f"http://127.0.0.1:{server.server_port}/gbfs/en"
+    sys.path.insert(0, str(ROOT))
+    cwd = os.getcwd()
+    workdir = tempfile.TemporaryDirectory(prefix="ridepulse-load-")
+    os.chdir(workdir.name)  # snapshot history and the ring go to a scratch data/ dir
+    try:
+        summary, pages = ramp(feed, args.sessions, args.rounds, args.timeout)
+    finally:
+        server.shutdown()
+        os.chdir(cwd)
+        workdir.cleanup()
+
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(summary.round(3).to_string(index=False))
+        print()
+        print(pages.round(3).to_string(index=False))
+    if args.out:
+        args.out.write_text(json.dumps({
+            "summary": summary.to_dict(orient="records"),
+            "pages": pages.to_dict(orient="records"),
+        }, indent=2, default=float))
+    return 0 if summary["failed"].sum() == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import threading
+import numpy as np
+import pandas as pd
+
+STALE_AFTER_MIN = 30          # last_reported older than this is stale
+CAPACITY_TOLERANCE = 2        # bikes + docks (+ disabled) may drift this far from capacity
+FROZEN_MIN_SILENT_MIN = 90    # never call a station frozen before this much silence
+FROZEN_GAP_MULTIPLE = 4       # ...or before this many of its usual gaps between changes
+FROZEN_NO_BASELINE_MIN = 240  # silence limit for stations with no change seen yet
+GAP_SMOOTHING = 0.2           # EWMA weight of the newest gap between changes
+
+# reason -> quality weight applied when it fires (lowest wins)
+REASONS = {
+    "stale_report": 0.0,
+    "frozen_counts": 0.0,
+    "not_renting_with_bikes": 0.5,
+    "capacity_mismatch": 0.5,
+}
+
+
+def _col(df, name, default=np.nan):
+    if name in df.columns:
+        return pd.to_numeric(df[name], errors="coerce").to_numpy(float)
+    return np.full(len(df), default, dtype=float)
+
+
+class StationAnomalyDetector:
+    """
+    Vectorized per-station health checks, run once per status update.
+
+    Instant checks look at the current frame only. "frozen_counts" compares how
+    long a station's counts have been unchanged with a rolling baseline of its
+    usual gap between changes, so quiet stations are not flagged as early as
+    busy ones. The baseline only moves when a change is seen, so a stuck
+    station cannot teach the detector that silence is normal. Polls only
+    happen while someone is viewing, so a gap between polls longer than
+    FROZEN_MIN_SILENT_MIN is unobserved time and does not count as silence.
+    """
+
+    def __init__(self):
+        self.ids = pd.Index([], dtype=object)
+        self.counts = np.empty((0, 2))
+        self.last_change = np.empty(0)
+        self.gap_min = np.empty(0)
+        self.last_poll = None
+        self.version = None
+        self.flags = pd.DataFrame()
+        self._lock = threading.Lock()
+
+    def _align(self, station_ids):
+        keys = pd.Index(pd.Series(station_ids).astype(str))
+        idx = self.ids.get_indexer(keys)
+        new = pd.unique(keys[idx < 0])
+        if len(new):
+            n = len(new)
+            self.ids = self.ids.append(pd.Index(new))
+            self.counts = np.vstack([self.counts, np.full((n, 2), np.nan)])
+            self.last_change = np.concatenate([self.last_change, np.full(n, np.nan)])
+            self.gap_min = np.concatenate([self.gap_min, np.full(n, np.nan)])
+            idx = self.ids.get_indexer(keys)
+        return idx
+
+    def observe(self, station_ids, bikes, docks, now_s: float):
+        """Fold one snapshot of counts into the per-station change baselines."""
+        idx = self._align(station_ids)
+        counts = np.column_stack([bikes, docks]).astype(float)
+        prev = self.counts[idx]
+        first = np.isnan(prev).any(axis=1) | np.isnan(self.last_change[idx])
+        changed = ~first & (counts != prev).any(axis=1)
+        idle = 0.0
+        if self.last_poll is not None and (now_s - self.last_poll) / 60.0 > FROZEN_MIN_SILENT_MIN:
+            idle = now_s - self.last_poll
+
+        gap = (now_s - self.last_change[idx]) / 60.0
+        base = self.gap_min[idx]
+        cap = np.where(np.isnan(base), FROZEN_NO_BASELINE_MIN, FROZEN_GAP_MULTIPLE * base)
+        gap = np.minimum(gap, cap)
+        smoothed = np.where(np.isnan(base), gap, GAP_SMOOTHING * gap + (1 - GAP_SMOOTHING) * base)
+        # a change somewhere in an unobserved stretch says nothing about the usual gap
+        self.gap_min[idx] = np.where(changed & (idle == 0), smoothed, base)
+        self.last_change[idx] = np.where(first | changed, now_s, self.last_change[idx] + idle)
+        self.counts[idx] = counts
+        self.last_poll = now_s if self.last_poll is None else max(self.last_poll, now_s)
+        return idx
+
+    def update(self, df: pd.DataFrame, version=None, now=None):
+        """
+        Return one row of flags per row of `df` (a merged station frame):
+        a boolean column per reason, "anomaly", "anomaly_reason" and
+        "quality_weight". Repeated calls for the same status version reuse
+        the previous result.
+        """
+        with self._lock:
+            if version is not None and version == self.version and len(self.flags):
+                return self._reuse(df)
+            now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+            now_s = now.timestamp()
+            bikes = _col(df, "num_bikes_available", 0.0)
+            docks = _col(df, "num_docks_available", 0.0)
+            idx = self.observe(df["station_id"], bikes, docks, now_s)
+
+            reported = _col(df, "last_reported")
+            installed = _col(df, "is_installed", 1.0)
+            renting = _col(df, "is_renting", 1.0)
+            capacity = _col(df, "capacity")
+            total = bikes + docks + np.nan_to_num(_col(df, "num_bikes_disabled", 0.0)) \
+                + np.nan_to_num(_col(df, "num_docks_disabled", 0.0))
+
+            silent = (now_s - self.last_change[idx]) / 60.0
+            base = self.gap_min[idx]
+            limit = np.where(np.isnan(base), FROZEN_NO_BASELINE_MIN,
+                             np.maximum(FROZEN_MIN_SILENT_MIN, FROZEN_GAP_MULTIPLE * base))
+            with np.errstate(invalid="ignore"):
+                flags = pd.DataFrame({
+                    "stale_report": np.isnan(reported) | ((now_s - reported) / 60.0 > STALE_AFTER_MIN),
+                    "frozen_counts": (installed == 1) & (silent >= limit),
+                    "not_renting_with_bikes": (renting == 0) & (bikes > 0),
+                    "capacity_mismatch": ~np.isnan(capacity) & (np.abs(total - capacity) > CAPACITY_TOLERANCE),
+                }, index=df.index)
+            self.flags = self._summarize(flags).set_axis(self.ids[idx])
+            self.version = version
+            return self.flags.set_axis(df.index)
+
+    def _summarize(self, flags):
+        reasons = list(REASONS)
+        hits = flags[reasons].to_numpy()
+        weights = np.where(hits, np.array([REASONS[r] for r in reasons]), 1.0).min(axis=1)
+        any_hit = hits.any(axis=1)
+        labels = np.full(len(flags), "", dtype=object)
+        labels[any_hit] = [", ".join(np.array(reasons)[row]) for row in hits[any_hit]]
+        flags["anomaly"] = any_hit
+        flags["anomaly_reason"] = labels
+        flags["quality_weight"] = weights
+        return flags
+
+    def _reuse(self, df):
+        keys = pd.Index(df["station_id"].astype(str))
+        out = self.flags.reindex(keys)
+        for r in REASONS:
+            out[r] = out[r].fillna(False).astype(bool)
+        out["anomaly"] = out["anomaly"].fillna(False).astype(bool)
+        out["anomaly_reason"] = out["anomaly_reason"].fillna("")
+        out["quality_weight"] = out["quality_weight"].fillna(1.0)
+        return out.set_axis(df.index)
+
+
+def trusted(df: pd.DataFrame):
+    """Rows not flagged as anomalous (all rows if the frame carries no flags)."""
+    if "anomaly" not in df.columns:
+        return df
+    return df[~df["anomaly"]]
@@ -0,0 +1,165 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+DEFAULT_HORIZONS = (1, 5, 10, 30)
+
+
+def _ma_levels(X: np.ndarray, window: int = 5):
+    """
+    L[:, o] = moving_average_forecast(x[:o], window)[0] for every origin o,
+    i.e. the mean of the last `window` non-NaN values (fewer if not available).
+    """
+    rows, T = X.shape
+    valid = ~np.isnan(X)
+    counts = np.zeros((rows, T + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+    sums = np.zeros((rows, T + 1))
+    np.cumsum(np.where(valid, X, 0.0), axis=1, out=sums[:, 1:])
+    # first time position at which the valid count reaches counts - window
+    target = np.maximum(counts - window, 0)
+    offset = (np.arange(rows) * (T + 2))[:, None]
+    flat = (counts + offset).ravel()
+    pos = np.searchsorted(flat, (target + offset).ravel(), side="left").reshape(rows, T + 1)
+    pos -= (np.arange(rows) * (T + 1))[:, None]
+    head = np.take_along_axis(sums, pos, axis=1)
+    n = np.minimum(counts, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, (sums - head) / n, np.nan)
+
+
+def _hw_levels(X: np.ndarray, alpha: float = 0.5):
+    """L[:, o] = last value of holt_winters_like(x[:o], alpha), NaN gaps skipped."""
+    rows, T = X.shape
+    levels = np.full((rows, T + 1), np.nan)
+    level = np.full(rows, np.nan)
+    for t in range(T):
+        x = X[:, t]
+        seen = ~np.isnan(x)
+        level = np.where(np.isnan(level), x, level)
+        level = np.where(seen, alpha * x + (1 - alpha) * level, level)
+        levels[:, t + 1] = level
+    return levels
+
+
+# name -> (vectorized origin forecaster, default params)
+# Both models in utils.models produce flat forecasts, so one level per origin
+# is enough to score every horizon.
+FORECASTERS = {
+    "naive": (_ma_levels, {"window": 1}),
+    "moving_average": (_ma_levels, {"window": 5}),
+    "holt_winters_like": (_hw_levels, {"alpha": 0.5}),
+}
+
+
+def _score_rows(X, names, params, horizons, min_train, step):
+    """Absolute / percentage error sums per (forecaster, horizon, row)."""
+    rows, T = X.shape
+    out = np.zeros((len(names), len(horizons), 4, rows))
+    for i, name in enumerate(names):
+        fn, defaults = FORECASTERS[name]
+        L = fn(X, **{**defaults, **params.get(name, {})})
+        for j, h in enumerate(horizons):
+            origins = np.arange(min_train, T - h + 1, step)
+            if len(origins) == 0:
+                continue
+            actual = X[:, origins + h - 1]
+            err = np.abs(actual - L[:, origins])
+            ok = ~np.isnan(err)
+            nz = ok & (actual != 0)
+            out[i, j, 0] = np.where(ok, err, 0).sum(axis=1)
+            out[i, j, 1] = ok.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[i, j, 2] = np.where(nz, err / np.abs(actual), 0).sum(axis=1)
+            out[i, j, 3] = nz.sum(axis=1)
+    return out
+
+
+def _score_chunk(shm_name, shape, start, stop, names, params, horizons, min_train, step):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:stop]
+        return start, _score_rows(X, names, params, horizons, min_train, step)
+    finally:
+        shm.close()
+
+
+def backtest(history: pd.DataFrame, forecasters=None, horizons=DEFAULT_HORIZONS,
+             min_train: int = 30, step: int = 1, params=None,
+             workers: int = None, chunk_rows: int = 256):
+    """
+    Rolling-origin backtest of each column of `history` (rows = time, columns =
+    stations or series). Every origin from `min_train` on (every `step`
+    snapshots) forecasts from the data before it and is scored at each horizon.
+
+    Station chunks are scored across a process pool; the matrix is shared with
+    workers through shared memory so no DataFrames are pickled. Workers are
+    spawned, not forked, since the caller is usually a multithreaded server.
+    Horizons and `step` count rows of `history`, not minutes.
+    Returns one row per (series, forecaster, horizon) with MAE and MAPE (%).
+    MAPE skips zero actuals.
+    """
+    names = list(forecasters or FORECASTERS)
+    params = params or {}
+    horizons = [int(h) for h in horizons]
+    X = np.ascontiguousarray(history.to_numpy(dtype=np.float64).T)
+    rows = X.shape[0]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, -(-rows // chunk_rows)))
+
+    if workers == 1:
+        scores = _score_rows(X, names, params, horizons, min_train, step)
+    else:
+        scores = np.zeros((len(names), len(horizons), 4, rows))
+        shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [
+                    pool.submit(_score_chunk, shm.name, X.shape, a, min(a + chunk_rows, rows),
+                                names, params, horizons, min_train, step)
+                    for a in range(0, rows, chunk_rows)
+                ]
+                for f in futures:
+                    a, part = f.result()
+                    scores[..., a:a + part.shape[-1]] = part
+        finally:
+            shm.close()
+            shm.unlink()
+
+    abs_sum, n, ape_sum, n_ape = scores[:, :, 0], scores[:, :, 1], scores[:, :, 2], scores[:, :, 3]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = abs_sum / n
+        mape = 100.0 * ape_sum / n_ape
+    idx = pd.MultiIndex.from_product([names, horizons, history.columns],
+                                     names=["forecaster", "horizon", "series"])
+    res = pd.DataFrame({
+        "mae": mae.ravel(),
+        "mape": mape.ravel(),
+        "n": n.ravel().astype(int),
+    }, index=idx).reset_index()
+    return res[res["n"] > 0].reset_index(drop=True)
+
+
+def leaderboard(results: pd.DataFrame):
+    """Mean MAE/MAPE per forecaster and horizon, ranked by MAE within each horizon."""
+    if len(results) == 0:
+        return results
+    board = (results.groupby(["horizon", "forecaster"])
+             .agg(mae=("mae", "mean"), mape=("mape", "mean"), series=("series", "nunique"))
+             .reset_index())
+    board["rank"] = board.groupby("horizon")["mae"].rank(method="min").astype(int)
+    return board.sort_values(["horizon", "rank"]).reset_index(drop=True)
+
+
+def best_by_series(results: pd.DataFrame, horizon: int):
+    """Lowest-MAE forecaster per series at one horizon."""
+    h = results[results["horizon"] == horizon].dropna(subset=["mae"])
+    if len(h) == 0:
+        return h
+    return h.loc[h.groupby("series")["mae"].idxmin()].reset_index(drop=True)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.cluster import KMeans
+
+PROFILE_TZ = "America/New_York"
+MINUTE_BINS = 1440
+CLUSTER_BIN_MIN = 15          # minute bins are pooled to this width before clustering
+DAILY_DECAY = 0.97            # weight kept by older days at each local-day rollover (~23-day half-life)
+MIN_COVERAGE = 0.5            # share of pooled bins a station needs before it is clustered
+N_COHORTS = 4
+NOT_ENOUGH_HISTORY = "Not enough history"
+
+_MAGIC = b"RPPROF01"
+_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("stations", "<i8"),
+    ("bins", "<i8"),
+    ("last_ts", "<f8"),       # epoch seconds of the last folded ring slot
+])
+
+
+class ProfileStore:
+    """
+    Memory-mapped running sums of percent_full per station and local minute of
+    day, one row per column of the recent-state ring (so station ids are shared
+    with it). Folding a snapshot is a single row update; older days fade by
+    DAILY_DECAY each time the local day rolls over.
+    """
+
+    def __init__(self, path, stations: int, readonly=False):
+        self.path = Path(path)
+        if not self.path.exists():
+            if readonly:
+                raise FileNotFoundError(self.path)
+            self._create(stations)
+        mode = "r" if readonly else "r+"
+        self.header = np.memmap(self.path, dtype=_HEADER, mode=mode, shape=(1,))
+        h = self.header[0]
+        if h["magic"] != _MAGIC or h["bins"] != MINUTE_BINS:
+            raise ValueError(f"{self.path} is not a compatible profile store")
+        self.stations = int(h["stations"])
+        shape = (self.stations, MINUTE_BINS)
+        offset = _HEADER.itemsize
+        self.sums = np.memmap(self.path, dtype="<f4", mode=mode, offset=offset, shape=shape)
+        offset += self.sums.nbytes
+        self.counts = np.memmap(self.path, dtype="<f4", mode=mode, offset=offset, shape=shape)
+
+    def _create(self, stations):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.truncate(_HEADER.itemsize + 2 * 4 * stations * MINUTE_BINS)
+        header = np.memmap(self.path, dtype=_HEADER, mode="r+", shape=(1,))
+        header[0] = (_MAGIC, stations, MINUTE_BINS, 0.0)
+        header.flush()
+        del header
+
+    def fold(self, ring):
+        """Add every ring slot newer than the last fold. Returns the number of slots folded."""
+        ts, data = ring.window(len(ring), ["percent_full"])
+        last = float(self.header[0]["last_ts"])
+        new = np.flatnonzero(ts.asi8 // 10**9 > last)
+        if len(new) == 0:
+            return 0
+        full = data[new, :self.stations, 0]
+        local = ts[new].tz_convert(PROFILE_TZ)
+        bins = (local.hour * 60 + local.minute).to_numpy()
+        if last > 0:
+            prev_day = pd.Timestamp(last, unit="s", tz="UTC").tz_convert(PROFILE_TZ).normalize()
+            days = (local[-1].normalize() - prev_day).days
+            if days > 0:
+                self.sums *= DAILY_DECAY ** days
+                self.counts *= DAILY_DECAY ** days
+        seen = ~np.isnan(full)
+        cols = np.arange(full.shape[1])
+        for t, b in enumerate(bins):
+            self.sums[cols, b] += np.where(seen[t], full[t], 0.0)
+            self.counts[cols, b] += seen[t]
+        self.header[0]["last_ts"] = float(ts[new[-1]].timestamp())
+        self.sums.flush()
+        self.counts.flush()
+        self.header.flush()
+        return len(new)
+
+    def pooled_profiles(self, n_stations: int, width: int = CLUSTER_BIN_MIN):
+        """(stations x 1440/width) mean percent_full per pooled bin; NaN where never observed."""
+        k = MINUTE_BINS // width
+        sums = np.asarray(self.sums[:n_stations]).reshape(n_stations, k, width).sum(axis=2)
+        counts = np.asarray(self.counts[:n_stations]).reshape(n_stations, k, width).sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+def normalize_profiles(P: np.ndarray):
+    """Fill gaps by circular interpolation across the day, then z-score each station's day."""
+    k = P.shape[1]
+    tiled = pd.DataFrame(np.hstack([P, P, P]).T)
+    filled = tiled.interpolate(limit_direction="both").to_numpy().T[:, k:2 * k]
+    mean = filled.mean(axis=1, keepdims=True)
+    std = filled.std(axis=1, keepdims=True)
+    return np.where(std > 0, (filled - mean) / np.where(std > 0, std, 1), 0.0)
+
+
+def _cohort_name(centroid: np.ndarray, width: int):
+    per_hour = 60 // width
+    morning = centroid[10 * per_hour] - centroid[6 * per_hour]
+    evening = centroid[20 * per_hour] - centroid[16 * per_hour]
+    if morning < -0.5 and evening > 0.5:
+        return "Residential — morning drain, evening refill"
+    if morning > 0.5 and evening < -0.5:
+        return "Office — morning fill, evening drain"
+    if abs(morning) <= 0.5 and abs(evening) <= 0.5:
+        return "Steady all day"
+    return "Midday swing"
+
+
+def cluster_profiles(station_ids, P: np.ndarray, k: int = N_COHORTS,
+                     width: int = CLUSTER_BIN_MIN, min_coverage: float = MIN_COVERAGE):
+    """
+    KMeans on normalized daily shapes. Returns a frame with station_id, cohort
+    and coverage, plus the cohort centroids (normalized profile per cohort).
+    """
+    coverage = (~np.isnan(P)).mean(axis=1) if P.size else np.empty(0)
+    out = pd.DataFrame({"station_id": pd.Index(station_ids).astype(str),
+                        "cohort": NOT_ENOUGH_HISTORY, "coverage": coverage})
+    ok = np.flatnonzero(coverage >= min_coverage)
+    if len(ok) < 2:
+        return out, pd.DataFrame()
+    X = normalize_profiles(P[ok])
+    k = min(k, len(ok))
+    km = KMeans(n_clusters=k, n_init=10, random_state=42)
+    labels = km.fit_predict(X)
+    names, used = [], {}
+    for c in km.cluster_centers_:
+        name = _cohort_name(c, width)
+        used[name] = used.get(name, 0) + 1
+        names.append(name if used[name] == 1 else f"{name} ({used[name]})")
+    out.loc[ok, "cohort"] = np.array(names, dtype=object)[labels]
+    hours = np.arange(X.shape[1]) * width / 60.0
+    centroids = pd.DataFrame(km.cluster_centers_.T, index=hours, columns=names)
+    centroids.index.name = "hour"
+    return out, centroids
@@ -1,14 +1,27 @@
+import os
 import streamlit as st
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from utils.ringbuffer import StationRing, RingBusy
+from utils.anomalies import StationAnomalyDetector
+from utils.models import TravelMatrix
+from utils.retention import seal_and_export, load_archives, to_utc
+from utils.cohorts import ProfileStore, cluster_profiles, PROFILE_TZ, NOT_ENOUGH_HISTORY
 
-GBFS_INFO = "https://gbfs.citibikenyc.com/gbfs/en/station_information.json"
-GBFS_STATUS = "https://gbfs.citibikenyc.com/gbfs/en/station_status.json"
+GBFS_BASE = os.environ.get("RIDEPULSE_GBFS_BASE", "https://gbfs.citibikenyc.com/gbfs/en")
+GBFS_INFO = f"{GBFS_BASE}/station_information.json"
+GBFS_STATUS = f"{GBFS_BASE}/station_status.json"
 DATA_DIR = Path("data")
 PARQUET = DATA_DIR / "snapshots.parquet"
 CSV = DATA_DIR / "snapshots.csv"
+RING = DATA_DIR / "recent_state.ring"
+ARCHIVE_DIR = DATA_DIR / "archive"
+PROFILES = DATA_DIR / "station_profiles.mmap"
+COHORTS = DATA_DIR / "station_cohorts.parquet"
+COHORT_CENTROIDS = DATA_DIR / "cohort_centroids.parquet"
 SNAPSHOT_TTL_MIN = 1  # record a snapshot at most every 1 minute
 
 DATA_DIR.mkdir(exist_ok=True)
@@ -33,6 +46,20 @@ def station_status():
     last_updated = datetime.fromtimestamp(data.get("last_updated", datetime.now().timestamp()), tz=timezone.utc)
     return df, last_updated
 
+def station_info_version(info: pd.DataFrame):
+    """Stable fingerprint of station ids and coordinates."""
+    cols = [c for c in ("station_id", "lat", "lng") if c in info.columns]
+    return str(int(pd.util.hash_pandas_object(info[cols], index=False).sum()))
+
+@st.cache_resource(max_entries=2)
+def _travel_matrix(version: str, _info: pd.DataFrame):
+    return TravelMatrix(_info)
+
+def travel_matrix():
+    """Trip-duration matrix for the current station_information, cached per version."""
+    info = station_information()
+    return _travel_matrix(station_info_version(info), info)
+
 def merged_station_frame(force: bool=False):
     if force:
         station_information.clear()
@@ -50,7 +77,8 @@ def merged_station_frame(force: bool=False):
     cap = cap.replace(0, 1)
     df["percent_full"] = (df["num_bikes_available"] / cap).clip(0, 1)
     df["last_updated_utc"] = last_updated
-    return df
+    flags = _anomaly_detector().update(df, version=last_updated)
+    return df.join(flags)
 
 def _load_snapshots_df():
     if PARQUET.exists():
@@ -71,9 +99,49 @@ def _save_snapshots_df(df_snap):
     except Exception:
         df_snap.to_csv(CSV, index=False)
 
+@st.cache_resource
+def _ring_writer():
+    return StationRing(RING)
+
+def _ring_reader():
+    try:
+        return StationRing(RING, readonly=True)
+    except (OSError, ValueError):
+        return None
+
+@st.cache_resource
+def _profile_store():
+    return ProfileStore(PROFILES, stations=_ring_writer().stations)
+
+def _record_ring(now, df):
+    try:
+        ring = _ring_writer()
+        ring.write(now, df)
+        _profile_store().fold(ring)
+    except (OSError, ValueError, RingBusy):
+        pass
+
+@st.cache_resource
+def _anomaly_detector():
+    """Shared detector, warmed up from the per-station counts in the ring."""
+    detector = StationAnomalyDetector()
+    ring = _ring_reader()
+    if ring is not None and len(ring):
+        try:
+            ts, data = ring.window(len(ring), ["num_bikes_available", "num_docks_available"])
+        except RingBusy:
+            return detector
+        ids = ring.station_ids()[:data.shape[1]]
+        bikes, docks = data[..., 0], data[..., 1]
+        for t in range(len(ts)):
+            seen = ~np.isnan(bikes[t])
+            detector.observe(ids[seen], bikes[t, seen], docks[t, seen], ts[t].timestamp())
+    return detector
+
 def record_snapshot_if_due(df: pd.DataFrame):
     """
-    Append a compact snapshot of totals to local history at most once per minute.
+    Append a compact snapshot of totals to local history at most once per minute,
+    and the per-station state of the same snapshot to the recent-state ring.
     """
     hist = _load_snapshots_df()
     now = datetime.utcnow().replace(tzinfo=timezone.utc)
@@ -86,19 +154,122 @@ def record_snapshot_if_due(df: pd.DataFrame):
     }
     if len(hist) == 0:
         _save_snapshots_df(pd.DataFrame([row]))
+        _record_ring(now, df)
         return
 
     last_ts = pd.to_datetime(hist["ts"].max(), utc=True)
     if (now - last_ts) >= timedelta(minutes=SNAPSHOT_TTL_MIN):
         new_hist = pd.concat([hist, pd.DataFrame([row])], ignore_index=True)
+        try:
+            new_hist = seal_and_export(new_hist, ARCHIVE_DIR, now)
+        except ImportError:
+            pass  # archiving needs pyarrow; keep full history live without it
         _save_snapshots_df(new_hist)
+        _record_ring(now, df)
 
 def get_snapshot_history(n: int = 180):
     """
     Return the last n snapshots (about 3 hours at 1-min cadence).
+    Windows the recent-state ring can cover are read from it without touching
+    Parquet, unless the ring ran out of station columns and would undercount.
     """
+    ring = _ring_reader()
+    if ring is not None and 0 < n <= len(ring) and ring.dropped == 0:
+        try:
+            return ring.totals(n)
+        except RingBusy:
+            pass
     hist = _load_snapshots_df()
     if len(hist) == 0:
         return []
     hist["ts"] = pd.to_datetime(hist["ts"], utc=True)
-    return hist.sort_values("ts").tail(n)
\ No newline at end of file
+    return hist.sort_values("ts").tail(n)
+
+def get_history_range(start, end=None):
+    """
+    Snapshots between start and end (UTC; naive times are taken as UTC). Live
+    full-resolution rows are used where they exist; older ranges come from the
+    downsampled archives.
+    """
+    start, end = to_utc(start), to_utc(end)
+    live = _load_snapshots_df()
+    if len(live):
+        live["ts"] = pd.to_datetime(live["ts"], utc=True)
+        live_start = live["ts"].min()
+    else:
+        live_start = None
+    parts = []
+    if live_start is None or start < live_start:
+        arch_end = end
+        if live_start is not None:
+            before_live = live_start - timedelta(microseconds=1)
+            arch_end = before_live if end is None else min(end, before_live)
+        parts.append(load_archives(ARCHIVE_DIR, start, arch_end))
+    if len(live):
+        keep = live["ts"] >= start
+        if end is not None:
+            keep &= live["ts"] <= end
+        parts.append(live[keep])
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True).sort_values("ts").reset_index(drop=True)
+
+def get_station_history(n: int = 180, field: str = "num_bikes_available"):
+    """
+    Return one per-station field for the last n recorded snapshots from the
+    recent-state ring: rows are snapshot times, columns are station ids.
+    """
+    ring = _ring_reader()
+    if ring is None or len(ring) == 0:
+        return pd.DataFrame()
+    try:
+        ts, data = ring.window(n, [field])
+    except RingBusy:
+        return pd.DataFrame()
+    return pd.DataFrame(data[..., 0], index=ts,
+                        columns=ring.station_ids()[:data.shape[1]])
+
+
+@st.cache_data(ttl=3600)
+def _cohorts_for_day(today: str):
+    try:
+        cohorts = pd.read_parquet(COHORTS)
+        if len(cohorts) and cohorts["day"].iloc[0] == today:
+            return cohorts.drop(columns="day"), pd.read_parquet(COHORT_CENTROIDS)
+    except Exception:
+        pass
+    ring = _ring_reader()
+    try:
+        store = ProfileStore(PROFILES, stations=0, readonly=True)
+    except (OSError, ValueError):
+        store = None
+    if ring is None or store is None:
+        return pd.DataFrame(columns=["station_id", "cohort", "coverage"]), pd.DataFrame()
+    ids = ring.station_ids()
+    cohorts, centroids = cluster_profiles(ids, store.pooled_profiles(len(ids)))
+    if len(centroids) > 0:
+        try:
+            cohorts.assign(day=today).to_parquet(COHORTS, index=False)
+            centroids.to_parquet(COHORT_CENTROIDS)
+        except Exception:
+            pass
+    return cohorts, centroids
+
+def station_cohorts():
+    """
+    Cohort of every station by the shape of its daily availability profile,
+    plus the cohort centroids. Clusters are refit at most once per local day;
+    the profiles themselves are updated with every recorded snapshot. A fit
+    without enough history is not kept, so cohorts appear as soon as it fills in.
+    """
+    cohorts, centroids = _cohorts_for_day(pd.Timestamp.now(tz=PROFILE_TZ).date().isoformat())
+    if len(centroids) == 0:
+        _cohorts_for_day.clear()
+    return cohorts, centroids
+
+def with_cohorts(df: pd.DataFrame):
+    """Add a "cohort" column to a station frame."""
+    cohorts, _ = station_cohorts()
+    lookup = cohorts.set_index("station_id")["cohort"] if len(cohorts) else pd.Series(dtype=object)
+    return df.assign(cohort=df["station_id"].astype(str).map(lookup).fillna(NOT_ENOUGH_HISTORY))
@@ -1,3 +1,4 @@
+import threading
 import numpy as np
 import pandas as pd
 from sklearn.cluster import KMeans
@@ -20,7 +21,12 @@ def holt_winters_like(series: pd.Series, alpha: float = 0.5):
         smoothed.append(level)
     return pd.Series(smoothed, index=series.index)
 
-def classify_station_traffic(df_stations: pd.DataFrame, k: int = 3):
+def classify_station_traffic(df_stations: pd.DataFrame, k: int = 3, sample_weight=None):
+    """
+    Label stations Low/Medium/High. `sample_weight` (e.g. the frame's
+    quality_weight column) down-weights suspect stations when fitting;
+    every station still gets a label.
+    """
     if len(df_stations) == 0:
         return []
     X = np.column_stack([
@@ -29,7 +35,11 @@ def classify_station_traffic(df_stations: pd.DataFrame, k: int = 3):
     ])
     k = min(max(2, k), len(df_stations))  # ensure valid
     km = KMeans(n_clusters=k, n_init=10, random_state=42)
-    labels = km.fit_predict(X)
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=float)
+        if (sample_weight > 0).sum() < k:
+            sample_weight = None
+    labels = km.fit_predict(X, sample_weight=sample_weight)
     # order clusters by bikes dimension
     order = np.argsort(km.cluster_centers_[:, 1])
     mapping = {order[0]:"Low"}
@@ -42,7 +52,18 @@ def classify_station_traffic(df_stations: pd.DataFrame, k: int = 3):
             mapping[extra] = "Medium"
     return [mapping[l] for l in labels]
 
-def haversine_km(lat1, lon1, lat2, lon2):
+# Slower in commute peaks, faster on empty night streets.
+HOURLY_SPEED_KMH = (
+    14.0, 14.0, 14.0, 14.0, 14.0, 13.0,   # 00-05
+    12.0, 10.5, 10.5, 10.5, 12.0, 12.0,   # 06-11
+    12.0, 12.0, 12.0, 12.0, 10.5, 10.5,   # 12-17
+    10.5, 10.5, 12.0, 13.0, 13.0, 14.0,   # 18-23
+)
+DISTANCE_BANDS_KM = (2.0, 5.0)
+ROUTE_ADJUSTMENTS = (1.15, 1.25, 1.35)  # street network vs straight line, per band
+ROW_CACHE_SIZE = 512  # isochrone origin rows kept per TravelMatrix
+
+def _haversine(lat1, lon1, lat2, lon2):
     R = 6371.0
     t1, t2 = np.radians(lat1), np.radians(lat2)
     g1, g2 = np.radians(lon1), np.radians(lon2)
@@ -50,13 +71,104 @@ def haversine_km(lat1, lon1, lat2, lon2):
     dg = g2 - g1
     a = np.sin(dt/2)**2 + np.cos(t1)*np.cos(t2)*np.sin(dg/2)**2
     c = 2*np.arcsin(np.sqrt(a))
-    return float(R * c)
+    return R * c
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    return float(_haversine(lat1, lon1, lat2, lon2))
+
+def route_km(dist_km):
+    """Straight-line distance scaled by the adjustment of its distance band."""
+    dist_km = np.asarray(dist_km, dtype=float)
+    adj = np.select([dist_km < DISTANCE_BANDS_KM[0], dist_km < DISTANCE_BANDS_KM[1]],
+                    ROUTE_ADJUSTMENTS[:2], ROUTE_ADJUSTMENTS[2])
+    return dist_km * adj
+
+def _speed_kmh(mean_speed_kmh, hour, speed_profile):
+    if hour is None:
+        return np.asarray(mean_speed_kmh, dtype=float)
+    profile = np.asarray(HOURLY_SPEED_KMH if speed_profile is None else speed_profile, dtype=float)
+    return profile[np.asarray(hour, dtype=int) % len(profile)]
 
 def estimate_trip_duration_minutes(s1, s2, mean_speed_kmh=12.0):
     dist_km = haversine_km(s1["lat"], s1["lng"], s2["lat"], s2["lng"])
-    mins = (dist_km / mean_speed_kmh) * 60.0
-    adj = 1.15 if dist_km < 2 else (1.25 if dist_km < 5 else 1.35)
-    return float(np.round(mins * adj, 1))
+    return float(np.round(route_km(dist_km) / mean_speed_kmh * 60.0, 1))
+
+class TravelMatrix:
+    """
+    Station-to-station trip durations for one version of station_information,
+    using the same distance bands as estimate_trip_duration_minutes.
+
+    Route distances are computed in one NumPy pass per query. The full
+    station x station matrix is kept once a query asks for all of it, and
+    isochrone origin rows are kept (up to ROW_CACHE_SIZE) for within().
+    Distances stay float64, so cached and uncached answers agree. Speeds come from `mean_speed_kmh`, or from an hourly profile when
+    `hour` is given (a scalar, or one hour per origin / trip).
+    """
+
+    def __init__(self, stations: pd.DataFrame):
+        self.ids = pd.Index(stations["station_id"].astype(str))
+        self.lat = stations["lat"].to_numpy(dtype=float)
+        self.lng = stations["lng"].to_numpy(dtype=float)
+        self._route_km = None
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def _positions(self, station_ids):
+        if station_ids is None:
+            return np.arange(len(self.ids))
+        pos = self.ids.get_indexer(pd.Index(pd.Series(station_ids).astype(str)))
+        if (pos < 0).any():
+            raise KeyError("unknown station ids for this station_information version")
+        return pos
+
+    def route_km(self, origins=None, destinations=None):
+        o, d = self._positions(origins), self._positions(destinations)
+        if self._route_km is None and origins is None and destinations is None:
+            km = route_km(_haversine(self.lat[:, None], self.lng[:, None], self.lat[None, :], self.lng[None, :]))
+            self._route_km = km
+        if self._route_km is not None:
+            return self._route_km[np.ix_(o, d)]
+        return route_km(_haversine(self.lat[o, None], self.lng[o, None], self.lat[None, d], self.lng[None, d]))
+
+    def durations(self, origins=None, destinations=None, mean_speed_kmh=12.0, hour=None, speed_profile=None):
+        """Minutes from every origin (rows) to every destination (columns)."""
+        km = self.route_km(origins, destinations)
+        speed = _speed_kmh(mean_speed_kmh, hour, speed_profile)
+        if speed.ndim:
+            speed = speed[:, None]
+        mins = np.round(km / speed * 60.0, 1)
+        o, d = self._positions(origins), self._positions(destinations)
+        return pd.DataFrame(mins, index=self.ids[o], columns=self.ids[d])
+
+    def pair_durations(self, origins, destinations, mean_speed_kmh=12.0, hour=None, speed_profile=None):
+        """Minutes for each (origin[i], destination[i]) candidate trip."""
+        o, d = self._positions(origins), self._positions(destinations)
+        if self._route_km is not None:
+            km = self._route_km[o, d]
+        else:
+            km = route_km(_haversine(self.lat[o], self.lng[o], self.lat[d], self.lng[d]))
+        speed = _speed_kmh(mean_speed_kmh, hour, speed_profile)
+        return np.round(km / speed * 60.0, 1)
+
+    def _origin_row(self, pos: int):
+        if self._route_km is not None:
+            return self._route_km[pos]
+        with self._lock:
+            row = self._rows.get(pos)
+            if row is None:
+                if len(self._rows) >= ROW_CACHE_SIZE:
+                    self._rows.pop(next(iter(self._rows)))
+                row = route_km(_haversine(self.lat[pos], self.lng[pos], self.lat, self.lng))
+                self._rows[pos] = row
+            return row
+
+    def within(self, origin, minutes: float, mean_speed_kmh=12.0, hour=None, speed_profile=None):
+        """Station ids reachable from `origin` within `minutes` (isochrone), nearest first."""
+        km = self._origin_row(self._positions([origin])[0])
+        mins = pd.Series(np.round(km / _speed_kmh(mean_speed_kmh, hour, speed_profile) * 60.0, 1),
+                         index=self.ids, name=str(origin))
+        return mins[mins <= minutes].sort_values()
+
 
 def rider_type_predictor(hour: int, duration_min: float):
     if (7 <= hour <= 10) or (16 <= hour <= 19):
@@ -1,20 +1,31 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from utils.stats import station_summary, top_k, TOP_K
 
-def kpi_cards(df, c1, c2, c3, c4):
-    total_bikes = int(df["num_bikes_available"].sum())
-    total_docks = int(df["num_docks_available"].sum())
-    stations = len(df)
-    avg_full = float(df["percent_full"].mean() * 100)
+def kpi_cards(df, c1, c2, c3, c4, exclude_suspect: bool = True):
+    if exclude_suspect:
+        summary = station_summary(df)
+        total_bikes, total_docks = summary["total_bikes"], summary["total_docks"]
+        stations, suspect = summary["trusted"], summary["suspect"]
+        avg_full = summary["avg_fill"] * 100
+    else:
+        total_bikes = int(df["num_bikes_available"].sum())
+        total_docks = int(df["num_docks_available"].sum())
+        stations, suspect = len(df), 0
+        avg_full = float(df["percent_full"].mean() * 100) if len(df) else 0.0
+    note = f"{suspect:,} suspect stations excluded" if suspect else None
 
-    c1.metric("🚲 Available Bikes", f"{total_bikes:,}")
-    c2.metric("🅿️ Open Docks", f"{total_docks:,}")
-    c3.metric("📍 Active Stations", f"{stations:,}")
-    c4.metric("⚙️ Avg Station Fill", f"{avg_full:.1f}%")
+    c1.metric("🚲 Available Bikes", f"{total_bikes:,}", help=note)
+    c2.metric("🅿️ Open Docks", f"{total_docks:,}", help=note)
+    c3.metric("📍 Active Stations", f"{stations:,}", help=note)
+    c4.metric("⚙️ Avg Station Fill", f"{avg_full:.1f}%", help=note)
 
 def top_stations_bar(df, n=10):
-    top = df.sort_values("num_bikes_available", ascending=False).head(n).copy()
+    if n <= TOP_K:
+        top = station_summary(df)["top"]["most_bikes"].head(n).copy()
+    else:
+        top = top_k(df, "num_bikes_available", n).copy()
     top["label"] = top["name"].str.slice(0, 26) + top["name"].apply(lambda s: "…" if len(s) > 26 else "")
     fig = px.bar(
         top,
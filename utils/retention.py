@@ -0,0 +1,181 @@
+import logging
+import os
+import tempfile
+import pandas as pd
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+FULL_RESOLUTION_DAYS = 7     # keep every snapshot this long in the live file
+DOWNSAMPLE_FREQ = "15min"    # archived resolution beyond that
+ARCHIVE_KEEP_DAYS = 365      # delete archives older than this (None keeps all)
+ARCHIVE_GLOB = "snapshots-*.parquet"
+
+logger = logging.getLogger(__name__)
+
+_MEAN_COLUMNS = ["total_bikes", "total_docks", "active_stations", "avg_percent_full"]
+
+
+def downsample(hist: pd.DataFrame, freq: str = DOWNSAMPLE_FREQ):
+    """Mean of each snapshot column per `freq` bucket, plus the number of samples."""
+    cols = [c for c in _MEAN_COLUMNS if c in hist.columns]
+    g = hist.assign(ts=pd.to_datetime(hist["ts"], utc=True)).set_index("ts")[cols].resample(freq)
+    out = g.mean()
+    out["samples"] = g.size()
+    out = out[out["samples"] > 0].reset_index()
+    for c in ("total_bikes", "total_docks", "active_stations"):
+        if c in out.columns:
+            out[c] = out[c].round().astype(int)
+    return out
+
+
+def _merge_buckets(a: pd.DataFrame, b: pd.DataFrame):
+    """Combine two downsampled frames, weighting bucket means by their sample counts."""
+    both = pd.concat([a, b], ignore_index=True)
+    both["ts"] = pd.to_datetime(both["ts"], utc=True)
+    cols = [c for c in _MEAN_COLUMNS if c in both.columns]
+    weighted = both[cols].mul(both["samples"], axis=0).assign(ts=both["ts"], samples=both["samples"])
+    out = weighted.groupby("ts").sum()
+    out[cols] = out[cols].div(out["samples"], axis=0)
+    out = out.reset_index()
+    for c in ("total_bikes", "total_docks", "active_stations"):
+        if c in out.columns:
+            out[c] = out[c].round().astype(int)
+    return out
+
+
+def _archive_path(archive_dir: Path, day):
+    return archive_dir / f"snapshots-{day:%Y-%m-%d}.parquet"
+
+
+def seal_and_export(hist: pd.DataFrame, archive_dir: Path, now=None,
+                    full_days: int = FULL_RESOLUTION_DAYS, freq: str = DOWNSAMPLE_FREQ,
+                    keep_days=ARCHIVE_KEEP_DAYS):
+    """
+    Move whole UTC days older than `full_days` out of the live history into
+    one zstd-compressed, downsampled Parquet archive per day, and drop
+    archives older than `keep_days`. Returns the rows to keep live: a day
+    stays live unless its archive was written. Raises ImportError without
+    touching anything when pyarrow is missing.
+    """
+    if len(hist) == 0:
+        return hist
+    now = now or datetime.now(timezone.utc)
+    ts = pd.to_datetime(hist["ts"], utc=True)
+    cutoff = pd.Timestamp(now - timedelta(days=full_days)).floor("D")
+    sealed = ts < cutoff
+    if not sealed.any():
+        return hist
+
+    import pyarrow  # noqa: F401  -- fail before writing anything if archives can't be written
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    days = ts.dt.floor("D")
+    archived = pd.Series(False, index=hist.index)
+    for day, part in hist[sealed.to_numpy()].groupby(days[sealed].to_numpy()):
+        path = _archive_path(archive_dir, pd.Timestamp(day))
+        try:
+            part = downsample(part, freq)
+            # a day can be sealed twice if the live file was restored from a copy
+            prev = _read_or_quarantine(path) if path.exists() else None
+            if prev is not None:
+                part = _merge_buckets(prev, part)
+            _write_archive(part, path)
+        except OSError:
+            # keep this and later days live; they are sealed again on the next snapshot
+            logger.exception("could not archive %s", path)
+            break
+        archived |= (days == day).to_numpy()
+
+    if keep_days is not None:
+        oldest = pd.Timestamp(now - timedelta(days=keep_days)).floor("D")
+        for path in archive_dir.glob(ARCHIVE_GLOB):
+            day = _day_of(path)
+            if day is not None and day < oldest:
+                path.unlink(missing_ok=True)
+    return hist[~archived.to_numpy()].reset_index(drop=True)
+
+
+def _read_or_quarantine(path: Path):
+    """Existing archive for a day, or None after renaming an unreadable one to *.corrupt."""
+    try:
+        return pd.read_parquet(path)
+    except ValueError:
+        logger.exception("unreadable archive %s, moving it aside", path)
+        os.replace(path, path.with_name(path.name + ".corrupt"))
+        return None
+
+
+def _write_archive(part: pd.DataFrame, path: Path):
+    """Write via a temp file in the same directory so a failed write never leaves a partial archive."""
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    try:
+        part.to_parquet(tmp, index=False, compression="zstd", write_statistics=True)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _day_of(path: Path):
+    try:
+        return pd.Timestamp(path.stem.split("-", 1)[1], tz="UTC")
+    except ValueError:
+        return None
+
+
+def _ts_range(path: Path):
+    """Min/max of the ts column from Parquet footer statistics (no data read)."""
+    import pyarrow.parquet as pq
+    meta = pq.read_metadata(path)
+    col = meta.schema.to_arrow_schema().get_field_index("ts")
+    lo = hi = None
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        lo = stats.min if lo is None else min(lo, stats.min)
+        hi = stats.max if hi is None else max(hi, stats.max)
+    if lo is None:
+        return None
+    return to_utc(lo), to_utc(hi)
+
+
+def to_utc(value):
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def load_archives(archive_dir: Path, start=None, end=None):
+    """
+    Read archived (downsampled) history overlapping [start, end]. Files are
+    picked by name first and then by their ts column statistics, so long
+    ranges only open the files they need.
+    """
+    if not archive_dir.exists():
+        return pd.DataFrame()
+    start, end = to_utc(start), to_utc(end)
+    parts = []
+    for path in sorted(archive_dir.glob(ARCHIVE_GLOB)):
+        day = _day_of(path)
+        if day is not None and ((end is not None and day > end)
+                                or (start is not None and day + pd.Timedelta(days=1) <= start)):
+            continue
+        try:
+            span = _ts_range(path)
+            if span is not None and ((end is not None and span[0] > end)
+                                     or (start is not None and span[1] < start)):
+                continue
+            parts.append(pd.read_parquet(path))
+        except Exception:
+            continue
+    if not parts:
+        return pd.DataFrame()
+    out = pd.concat(parts, ignore_index=True)
+    out["ts"] = pd.to_datetime(out["ts"], utc=True)
+    if start is not None:
+        out = out[out["ts"] >= start]
+    if end is not None:
+        out = out[out["ts"] <= end]
+    return out.sort_values("ts").reset_index(drop=True)
@@ -0,0 +1,216 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single-writer rule is not enforced
+    fcntl = None
+
+RING_SLOTS = 360  # about 6 hours at 1-min cadence
+RING_STATIONS = 4096
+RING_FIELDS = (
+    "num_bikes_available",
+    "num_docks_available",
+    "capacity",
+    "percent_full",
+    "is_installed",
+    "is_renting",
+    "report_age_s",
+)
+
+_MAGIC = b"RPRING01"
+_ID_WIDTH = 48
+_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("slots", "<i8"),
+    ("stations", "<i8"),
+    ("fields", "<i8"),
+    ("cursor", "<i8"),   # total slots ever written; next slot is cursor % slots
+    ("n_ids", "<i8"),    # station ids assigned so far
+    ("seq", "<i8"),      # odd while a write is in progress
+    ("dropped", "<i8"),  # most new ids ever refused in one write for lack of columns
+])
+
+
+class RingBusy(RuntimeError):
+    """The writer kept the ring busy for every read attempt."""
+
+
+class StationRing:
+    """
+    Fixed-width, memory-mapped ring of recent per-station state.
+
+    Layout on disk: header | slot timestamps (int64 epoch s) | station ids | data
+    where data is float32 of shape (slots, stations, fields) and NaN marks a
+    station absent from a snapshot. One process writes (a writer holds an
+    exclusive lock on the file, so a second one fails with OSError); any number
+    of processes can open the file read-only and copy slots out without
+    deserializing anything.
+    """
+
+    def __init__(self, path, slots=RING_SLOTS, stations=RING_STATIONS,
+                 fields=RING_FIELDS, readonly=False):
+        self.path = Path(path)
+        self.fields = tuple(fields)
+        self._lock_fd = None
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(self.path)
+        else:
+            self._lock_writer()
+            if os.fstat(self._lock_fd).st_size == 0:
+                self._create(slots, stations)
+        mode = "r" if readonly else "r+"
+        self.header = np.memmap(self.path, dtype=_HEADER, mode=mode, shape=(1,))
+        h = self.header[0]
+        if h["magic"] != _MAGIC or h["fields"] != len(self.fields):
+            raise ValueError(f"{self.path} is not a compatible station ring")
+        self.slots, self.stations = int(h["slots"]), int(h["stations"])
+        offset = _HEADER.itemsize
+        self.ts = np.memmap(self.path, dtype="<i8", mode=mode, offset=offset, shape=(self.slots,))
+        offset += self.ts.nbytes
+        self.ids = np.memmap(self.path, dtype=f"S{_ID_WIDTH}", mode=mode, offset=offset, shape=(self.stations,))
+        offset += self.ids.nbytes
+        self.data = np.memmap(self.path, dtype="<f4", mode=mode, offset=offset,
+                              shape=(self.slots, self.stations, len(self.fields)))
+        self._id_index = None
+
+    def _lock_writer(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            raise OSError(f"{self.path} is already open for writing by another process")
+
+    def close(self):
+        """Release the writer lock (a no-op for readers)."""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _create(self, slots, stations):
+        size = (_HEADER.itemsize + 8 * slots + _ID_WIDTH * stations
+                + 4 * slots * stations * len(self.fields))
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        header = np.memmap(self.path, dtype=_HEADER, mode="r+", shape=(1,))
+        header[0] = (_MAGIC, slots, stations, len(self.fields), 0, 0, 0, 0)
+        header.flush()
+        del header
+
+    def __len__(self):
+        return int(min(self.header[0]["cursor"], self.slots))
+
+    @property
+    def dropped(self):
+        """Non-zero once stations were left out for lack of columns; totals then undercount."""
+        return int(self.header[0]["dropped"])
+
+    def station_ids(self):
+        n = int(self.header[0]["n_ids"])
+        return pd.Index(self.ids[:n].astype(str))
+
+    def _station_indices(self, station_ids):
+        """Map station ids to column indices, assigning free columns to new ids."""
+        if self._id_index is None or len(self._id_index) != int(self.header[0]["n_ids"]):
+            self._id_index = self.station_ids()
+        keys = pd.Index(pd.Series(station_ids).astype(str))
+        idx = self._id_index.get_indexer(keys)
+        new = np.flatnonzero(idx < 0)
+        if len(new):
+            n = int(self.header[0]["n_ids"])
+            room = max(0, self.stations - n)
+            unseen = pd.unique(keys[new])
+            fresh = unseen[:room]
+            if len(unseen) > room:
+                self.header[0]["dropped"] = max(self.dropped, len(unseen) - room)
+            self.ids[n:n + len(fresh)] = np.asarray(fresh, dtype=f"S{_ID_WIDTH}")
+            self.header[0]["n_ids"] = n + len(fresh)
+            self._id_index = self._id_index.append(pd.Index(fresh))
+            idx = self._id_index.get_indexer(keys)
+        return idx
+
+    def write(self, ts, df: pd.DataFrame):
+        """Write one snapshot of a merged station frame into the next slot."""
+        idx = self._station_indices(df["station_id"])
+        keep = idx >= 0
+        values = np.full((len(df), len(self.fields)), np.nan, dtype="<f4")
+        for j, name in enumerate(self.fields):
+            if name == "report_age_s":
+                if "last_reported" in df.columns:
+                    values[:, j] = ts.timestamp() - pd.to_numeric(df["last_reported"], errors="coerce").to_numpy(float)
+            elif name in df.columns:
+                values[:, j] = pd.to_numeric(df[name], errors="coerce").to_numpy(float)
+
+        cursor = int(self.header[0]["cursor"])
+        seq = int(self.header[0]["seq"])
+        slot = cursor % self.slots
+        self.header[0]["seq"] = seq + 1
+        self.data[slot] = np.nan
+        self.data[slot, idx[keep]] = values[keep]
+        self.ts[slot] = int(ts.timestamp())
+        self.header[0]["cursor"] = cursor + 1
+        self.header[0]["seq"] = seq + 2
+        self.data.flush()
+        self.ts.flush()
+        self.ids.flush()
+        self.header.flush()
+
+    def window(self, n: int, fields=None):
+        """
+        Return (timestamps, data) for the last n slots in chronological order.
+        Both are copied out of the mapping before the write sequence is checked
+        again, so a slot the writer is overwriting is never returned half-written.
+        Raises RingBusy if no consistent read succeeds. `fields` limits the
+        copy to those fields, in that order, on the last axis.
+        """
+        cols = slice(None) if fields is None else [self.field(f) for f in fields]
+        for _ in range(5):
+            seq = int(self.header[0]["seq"])
+            if seq % 2:
+                time.sleep(0.01)
+                continue
+            cursor = int(self.header[0]["cursor"])
+            n_ids = int(self.header[0]["n_ids"])
+            n = int(min(n, cursor, self.slots))
+            start = (cursor - n) % self.slots
+            if start + n <= self.slots:
+                ts = np.array(self.ts[start:start + n])
+                data = np.array(self.data[start:start + n, :n_ids][..., cols])
+            else:
+                order = np.arange(cursor - n, cursor) % self.slots
+                ts = np.asarray(self.ts[order])
+                data = self.data[order, :n_ids][..., cols]
+            if int(self.header[0]["seq"]) == seq:
+                return pd.to_datetime(ts, unit="s", utc=True), data
+            time.sleep(0.01)
+        raise RingBusy("station ring is being written; try again")
+
+    def field(self, name: str):
+        return self.fields.index(name)
+
+    def totals(self, n: int):
+        """Network totals per slot, matching the columns of the snapshot history."""
+        ts, data = self.window(n, ["num_bikes_available", "num_docks_available",
+                                   "is_installed", "percent_full"])
+        bikes, docks, installed, full = (data[..., j] for j in range(4))
+        present = ~np.isnan(bikes)
+        active = np.where(np.isnan(installed).all(axis=1), present.sum(axis=1),
+                          (installed == 1).sum(axis=1))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_full = np.nansum(full, axis=1) / (~np.isnan(full)).sum(axis=1)
+        return pd.DataFrame({
+            "ts": ts,
+            "total_bikes": np.nansum(bikes, axis=1).astype(int),
+            "total_docks": np.nansum(docks, axis=1).astype(int),
+            "active_stations": active.astype(int),
+            "avg_percent_full": avg_full.astype(float),
+        })
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.anomalies import trusted
+
+TOP_K = 15  # longest ranking any page shows
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+# ranking -> (column, largest first)
+RANKINGS = {
+    "most_bikes": ("num_bikes_available", True),
+    "most_docks": ("num_docks_available", True),
+    "fullest": ("percent_full", True),
+    "emptiest": ("num_bikes_available", False),
+}
+_TOP_COLUMNS = ["station_id", "name", "num_bikes_available", "num_docks_available", "percent_full", "capacity"]
+
+
+def top_k_positions(values, k: int, largest: bool = True):
+    """Positions of the k largest (or smallest) values, ordered; NaN sorts last."""
+    key = np.asarray(values, dtype=float)
+    key = -key if largest else key.copy()
+    key[np.isnan(key)] = np.inf
+    k = min(k, len(key))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    part = np.argpartition(key, k - 1)[:k] if k < len(key) else np.arange(len(key))
+    return part[np.argsort(key[part], kind="stable")]
+
+
+def top_k(df: pd.DataFrame, column: str, k: int, largest: bool = True):
+    return df.iloc[top_k_positions(df[column].to_numpy(dtype=float), k, largest)]
+
+
+def summarize_stations(df: pd.DataFrame):
+    """
+    Every per-render station statistic in one pass over the trusted rows:
+    totals, zero counts, quantiles, availability index and top-k rankings.
+    """
+    ok = trusted(df)
+    bikes = ok["num_bikes_available"].to_numpy(dtype=float)
+    docks = ok["num_docks_available"].to_numpy(dtype=float)
+    full = ok["percent_full"].to_numpy(dtype=float)
+    n = len(ok)
+    if n:
+        q = np.nanquantile(np.column_stack([bikes, docks, full]), QUANTILES, axis=0)
+    else:
+        q = np.full((len(QUANTILES), 3), np.nan)
+    cols = [c for c in _TOP_COLUMNS if c in ok.columns]
+    return {
+        "stations": len(df),
+        "trusted": n,
+        "suspect": len(df) - n,
+        "total_bikes": int(bikes.sum()),
+        "total_docks": int(docks.sum()),
+        "avg_fill": float(np.nanmean(full)) if n else 0.0,
+        "avg_bikes": float(bikes.mean()) if n else 0.0,
+        "zero_bikes": int((bikes == 0).sum()),
+        "zero_docks": int((docks == 0).sum()),
+        "max_capacity": int((bikes + docks).max()) if n else 0,
+        # share of stations where you can both take and return a bike
+        "availability_index": float(((bikes > 0) & (docks > 0)).mean()) if n else 0.0,
+        "quantiles": pd.DataFrame(q, index=list(QUANTILES), columns=["bikes", "docks", "percent_full"]),
+        "top": {
+            key: ok.iloc[top_k_positions(ok[col].to_numpy(dtype=float), TOP_K, largest)][cols]
+            for key, (col, largest) in RANKINGS.items()
+        },
+    }
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _cached_summary(version, _df):
+    return summarize_stations(_df)
+
+
+def station_summary(df: pd.DataFrame):
+    """
+    summarize_stations(df), computed once per status version and reused across
+    renders. The key includes the frame's station ids in order, so a filtered
+    or reordered frame never gets another frame's summary.
+    """
+    ids = df["station_id"] if "station_id" in df.columns else df.index.to_series()
+    hashes = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+    positions = np.arange(1, len(df) + 1, dtype=np.uint64)  # order-sensitive; wraps like a hash
+    version = (
+        str(df["last_updated_utc"].iloc[0]) if "last_updated_utc" in df.columns and len(df) else None,
+        len(df),
+        int(hashes.dot(positions)),
+        int(df["anomaly"].sum()) if "anomaly" in df.columns else 0,
+    )
+    return _cached_summary(version, df)